@@ -1,13 +1,17 @@
+import time
+t_run = time.perf_counter()  # before the imports below, so their cost counts as startup
+
 import streamlit as st
 import pandas as pd
-from prophet import Prophet
-from prophet.plot import plot_plotly, plot_components_plotly
 import numpy as np
 import re
-import base64
-import time
-import plotly.express as px
-import os
+from startup import begin_run, mark_ready, cold_start_seconds, encode_image, fit_model, forecast
+from tuning import load_best_params, model_regressors, store_key
+from scenarios import simulate, explain_scenario, promo_scenarios
+
+# prophet, prophet.plot and plotly are imported where they are first used, so a
+# fresh process shows the upload widget without waiting for them
+cold_start = begin_run()
 
 # ---------------------------
 # PAGE CONFIG
@@ -18,10 +22,9 @@ st.set_page_config(page_title="Generative Forecast Explanation System", layout="
 # BACKGROUND + CSS
 # ---------------------------
 def add_bg_from_local(image_path):
-    if os.path.exists(image_path):
-        with open(image_path, "rb") as f:
-            encoded_string = base64.b64encode(f.read()).decode()
-
+    # the ~300 KB image is read and encoded once per process, not on every rerun
+    encoded_string = encode_image(image_path)
+    if encoded_string:
         st.markdown(
             f"""
             <style>
@@ -88,6 +91,7 @@ uploaded = st.file_uploader(
     "prophet_ready.csv\nDrag and drop file here\nLimit 200MB per file • CSV",
     type="csv"
 )
+t_ready = mark_ready(t_run, cold_start)
 
 # Show uploaded file info
 if uploaded:
@@ -107,7 +111,18 @@ if uploaded:
 # ---------------------------
 if uploaded:
 
-    benchmark_results = []
+    t_cold = cold_start_seconds()
+    benchmark_results = [{
+        "Step": "Cold Start",
+        "Description": "Process's first run: script start (imports included) to upload widget shown.",
+        "Time (seconds)": round(t_cold, 3) if t_cold is not None else 0,
+        "Status": "Success" if t_cold is not None else "Not recorded"
+    }, {
+        "Step": "Warm Rerun Startup",
+        "Description": "This run: script start to upload widget shown.",
+        "Time (seconds)": round(t_ready, 3),
+        "Status": "Success"
+    }]
 
     # -------------------------------------
     # 1️⃣ DATA PREPROCESSING
@@ -148,6 +163,7 @@ if uploaded:
     with tab1:
         try:
             t_e1 = time.time()
+            import plotly.express as px
 
             st.header("🔍 Exploratory Data Analysis (EDA)")
             st.write("This section explores your dataset to understand data quality, trends, and relationships.")
@@ -217,17 +233,27 @@ if uploaded:
     # 3️⃣ FORECASTING TAB
     # -------------------------------------
     with tab2:
+        # Promo as a regressor so the what-if scenarios can switch it on/off.
+        # It changes the forecast itself, so the user can see and turn it off.
+        regressors = list(model_regressors(df))
+        if regressors and not st.checkbox(
+            "Use Promo as a forecast driver", value=True,
+            help="Fits Promo as an extra regressor. Future days are assumed to have no promotion."
+        ):
+            regressors = []
+
         try:
             t_f1 = time.time()
+            from prophet.plot import plot_plotly, plot_components_plotly
 
             st.header("📈 Forecasting")
             periods = st.slider("Days to Forecast", 30, 365, 90)
 
-            m = Prophet(yearly_seasonality=True, weekly_seasonality=True)
-            m.fit(df)
-
-            future = m.make_future_dataframe(periods=periods)
-            forecast = m.predict(future)
+            # per-store priors saved by tuning.py, Prophet defaults otherwise
+            params = load_best_params(store_key(df))
+            # fit and forecast are cached, so reruns (slider, chatbot typing) skip them
+            m = fit_model(df, params, tuple(regressors))
+            future, store, align_seconds, computed = forecast(m, df, params, tuple(regressors), periods)
 
             t_f2 = time.time()
             st.success(f"Model Execution Time: {round(t_f2 - t_f1,2)} seconds")
@@ -240,7 +266,7 @@ if uploaded:
             })
 
             st.subheader("📈 Forecast Plot")
-            st.plotly_chart(plot_plotly(m, forecast), use_container_width=True)
+            st.plotly_chart(plot_plotly(m, store.to_frame()), use_container_width=True)
 
             st.markdown("""
 ### 📝 Understanding the Forecast Plot
@@ -254,7 +280,8 @@ This helps identify expected rises, dips, and confidence levels.
 """)
 
             st.subheader("📉 Forecast Components")
-            st.plotly_chart(plot_components_plotly(m, forecast), use_container_width=True)
+            # component bounds aren't kept in the store, so plot the components without them
+            st.plotly_chart(plot_components_plotly(m, store.to_frame(), uncertainty=False), use_container_width=True)
 
             st.markdown("""
 ### 📝 What the Forecast Components Mean
@@ -264,15 +291,29 @@ This helps identify expected rises, dips, and confidence levels.
 - **Yearly** = seasonal cycles  
 """)
 
-            t_m1 = time.time()
-            merged = pd.merge(forecast, df, on="ds", how="left")
-            t_m2 = time.time()
-
+            mem = store.memory_report()
+            st.caption(
+                f"Forecast memory: {mem['compact_kb']} KB compact vs {mem['full_forecast_kb']} KB full "
+                f"({mem['saved_kb']} KB / {mem['saved_pct']}% saved for store {store_key(df)})"
+            )
+
+            # the export is only built once asked for, then kept with the (cached) store
+            if st.button("Prepare Forecast CSV") or st.session_state.get("forecast_csv"):
+                st.session_state["forecast_csv"] = True
+                st.download_button(
+                    "⬇ Download Forecast CSV",
+                    data=store.to_csv(),
+                    file_name="forecast.csv"
+                )
+
+            # a cache hit didn't align anything this run; say so instead of
+            # repeating the old timing as if it were fresh
             benchmark_results.append({
-                "Step": "Actual vs Forecast Merge",
-                "Description": "Combined predictions with actual values for comparison and analysis.",
-                "Time (seconds)": round(t_m2 - t_m1, 3),
-                "Status": "Success"
+                "Step": "Actual vs Forecast Alignment",
+                "Description": f"Aligned actual values to a compact float32 forecast by position "
+                               f"({mem['saved_kb']} KB / {mem['saved_pct']}% memory saved).",
+                "Time (seconds)": round(align_seconds, 3) if computed else 0,
+                "Status": "Success" if computed else f"Cached (took {align_seconds:.3f} s when computed)"
             })
 
         except Exception as e:
@@ -297,12 +338,11 @@ This helps identify expected rises, dips, and confidence levels.
             return pd.to_datetime(m.group(0)) if m else None
 
         # --- NEW EXPLANATION FUNC (Simplified + Human-Friendly) ---
-        def explain_date(date):
-            row = merged[merged["ds"] == date]
-            if row.empty:
+        def explain_date(date, closed=False):
+            row = store.row(date)
+            if row is None:
                 return "⚠️ No data for that exact date."
 
-            row = row.iloc[0]
             actual = row["y"]
             forecasted = row["yhat"]
             diff = actual - forecasted
@@ -327,6 +367,17 @@ This helps identify expected rises, dips, and confidence levels.
             if row.get("Promo", 1) == 0:
                 reasoning.append("No active promotion may have lowered demand.")
 
+            # What-if: flip the promo (and optionally close the store) on this date
+            what_if = []
+            if "Promo" in regressors:
+                what_if.append({"dates": [date], "overrides": {"Promo": 0 if row["Promo"] == 1 else 1}})
+            if closed:
+                what_if.append({"dates": [date], "overrides": {"Open": 0}})
+            if what_if:
+                results, _ = simulate(m, what_if, base=future)
+                for (_, res), sc in zip(results.iterrows(), what_if):
+                    reasoning.append(explain_scenario(res, sc["overrides"]) + ".")
+
             explanation = "\n".join(f"• {x}" for x in reasoning)
 
             return f"""
@@ -348,7 +399,7 @@ Sales changed due to weekly effects, seasonal behavior, and demand conditions.
             try:
                 t_c1 = time.time()
                 date = extract_date(question)
-                st.markdown(explain_date(date))
+                st.markdown(explain_date(date, closed="closed" in question.lower()))
                 t_c2 = time.time()
 
                 benchmark_results.append({
@@ -368,6 +419,38 @@ Sales changed due to weekly effects, seasonal behavior, and demand conditions.
                 })
                 chatbot_executed = True
 
+        # -------------------------------------
+        # 🧪 WHAT-IF SCENARIOS (batched)
+        # -------------------------------------
+        if "Promo" in regressors:
+            st.subheader("🧪 What-if: Promo on Every Non-Promo Day")
+            if st.button("Run Scenarios"):
+                try:
+                    scenarios = promo_scenarios(m, base=future)
+                    results, stats = simulate(m, scenarios, base=future)
+
+                    st.success(
+                        f"{stats['scenarios']} scenarios in {stats['total_seconds']} seconds "
+                        f"({stats['scenarios_per_second']} scenarios/sec, {stats['rows_predicted']} distinct rows predicted in batches)"
+                    )
+                    top = results.sort_values("delta", ascending=False).head(10)
+                    st.dataframe(top.rename(columns={
+                        "scenario": "Scenario", "baseline": "Baseline Sales",
+                        "scenario_sales": "Scenario Sales", "delta": "Delta"
+                    })[["Scenario", "Baseline Sales", "Scenario Sales", "Delta"]])
+                    st.caption("Days where running a promotion would have lifted sales the most.")
+
+                    benchmark_results.append({
+                        "Step": "What-if Scenario Simulation",
+                        "Description": f"Simulated {stats['scenarios']} promo scenarios with batched predicts "
+                                       f"({stats['scenarios_per_second']} scenarios/sec).",
+                        "Time (seconds)": stats["total_seconds"],
+                        "Status": "Success"
+                    })
+
+                except Exception as e:
+                    st.error(f"Scenario simulation failed: {e}")
+
     if not chatbot_executed:
         benchmark_results.append({
             "Step": "WHY Chatbot Reasoning",
@@ -380,6 +463,13 @@ Sales changed due to weekly effects, seasonal behavior, and demand conditions.
     # EXPORT BENCHMARK EXCEL
     # ---------------------------
     try:
+        benchmark_results.append({
+            "Step": "Full Rerun",
+            "Description": "Whole script run, i.e. the cost paid on every widget change.",
+            "Time (seconds)": round(time.perf_counter() - t_run, 3),
+            "Status": "Success"
+        })
+
         bench_df = pd.DataFrame(benchmark_results)
         excel_path = "benchmark_results.xlsx"
         bench_df.to_excel(excel_path, index=False)
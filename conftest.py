@@ -0,0 +1,2 @@
+# Makes the top-level modules (scenarios, tuning, ...) importable from tests/
+# under a bare `pytest` as well as `python -m pytest`.
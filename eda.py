@@ -1,11 +1,16 @@
+import time
+t_run = time.perf_counter()  # before the imports below, so their cost counts as startup
+
 import streamlit as st
 import pandas as pd
-from prophet import Prophet
-from prophet.plot import plot_plotly, plot_components_plotly
 import numpy as np
 import re
-import base64
-import time
+import logging
+from startup import begin_run, mark_ready, cold_start_seconds, encode_image, fit_model, forecast
+from tuning import load_best_params, model_regressors, store_key
+
+# prophet.plot is imported once a CSV is uploaded, so the upload widget shows first
+cold_start = begin_run()
 
 # ==========================================================
 # SET PAGE CONFIG
@@ -16,8 +21,8 @@ st.set_page_config(page_title="Generative Forecast Explanation System", layout="
 # APPLY FULL-PAGE BACKGROUND IMAGE
 # ==========================================================
 def add_bg_from_local(image_path):
-    with open(image_path, "rb") as f:
-        encoded_string = base64.b64encode(f.read()).decode()
+    # read and encoded once per process, not on every rerun
+    encoded_string = encode_image(image_path)
 
     st.markdown(
         f"""
@@ -75,7 +80,16 @@ st.title("📈 Generative Forecast Explanation System")
 # ==========================================================
 uploaded = st.file_uploader("Upload your CSV (columns: ds, y, Customers, Promo, DayOfWeek)", type="csv")
 
+# startup timings go to the server log, not the page
+t_ready = mark_ready(t_run, cold_start)
+logging.getLogger(__name__).info(
+    "Ready in %.3f s (%s run), cold start %s s", t_ready,
+    "cold" if cold_start else "warm", cold_start_seconds()
+)
+
 if uploaded:
+    from prophet.plot import plot_plotly, plot_components_plotly
+
     df = pd.read_csv(uploaded)
     df["ds"] = pd.to_datetime(df["ds"])
 
@@ -93,11 +107,20 @@ if uploaded:
 
     start_time = time.time()
 
-    m = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
-    m.fit(df)
-
-    future = m.make_future_dataframe(periods=periods)
-    forecast = m.predict(future)
+    # per-store priors saved by tuning.py (same regressors it tuned with);
+    # cached across reruns, so typing a question doesn't refit
+    params = load_best_params(store_key(df))
+    # same opt-out as app.py: Promo as a regressor changes the forecast itself
+    regressors = model_regressors(df)
+    if regressors and not st.checkbox(
+        "Use Promo as a forecast driver", value=True,
+        help="Fits Promo as an extra regressor. Future days are assumed to have no promotion."
+    ):
+        regressors = ()
+    m = fit_model(df, params, regressors)
+
+    # compact float32 forecast with the actuals aligned by position (no merge)
+    future, store, _, _ = forecast(m, df, params, regressors, periods)
 
     end_time = time.time()
     execution_time = end_time - start_time
@@ -106,12 +129,11 @@ if uploaded:
 
     # Forecast Plots
     st.subheader("📈 Forecast Plot")
-    st.plotly_chart(plot_plotly(m, forecast), use_container_width=True)
+    st.plotly_chart(plot_plotly(m, store.to_frame()), use_container_width=True)
 
     st.subheader("📉 Forecast Components")
-    st.plotly_chart(plot_components_plotly(m, forecast), use_container_width=True)
-
-    merged = pd.merge(forecast, df, on="ds", how="left")
+    # component bounds aren't kept in the store, so plot the components without them
+    st.plotly_chart(plot_components_plotly(m, store.to_frame(), uncertainty=False), use_container_width=True)
 
     # ==========================================================
     # SMART WHY CHATBOT
@@ -134,13 +156,11 @@ if uploaded:
         return None
 
     def explain_date(date):
-        row = merged[merged["ds"] == date]
+        row = store.row(date)
 
-        if row.empty:
+        if row is None:
             return "⚠️ No data for this date."
 
-        row = row.iloc[0]
-
         actual = row["y"]
         predicted = row["yhat"]
         trend = row["trend"]
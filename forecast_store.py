@@ -0,0 +1,111 @@
+import pandas as pd
+import numpy as np
+
+# ---------------------------
+# COMPACT FORECAST STORE
+# ---------------------------
+# m.predict() returns several dozen float64 columns (every term plus its
+# lower/upper bound). The app only reads the point forecast, its interval and
+# the components below, so those are kept as float32 arrays and the actuals are
+# aligned to them by position instead of a pd.merge on "ds".
+
+KEEP = [
+    "yhat", "yhat_lower", "yhat_upper",
+    "trend", "weekly", "yearly", "holidays",
+    "extra_regressors_additive", "extra_regressors_multiplicative",
+    "cap", "floor",
+]
+
+
+class ForecastStore:
+    """Column-oriented float32 view of a Prophet forecast plus the aligned actuals."""
+
+    def __init__(self, forecast, actuals=None, regressors=()):
+        self.ds = forecast["ds"].values
+        if len(self.ds) > 1 and not (np.diff(self.ds) > np.timedelta64(0)).all():
+            raise ValueError("forecast 'ds' must be sorted and unique")
+
+        keep = [c for c in KEEP + list(regressors) if c in forecast.columns]
+        self.columns = {c: forecast[c].to_numpy(np.float32) for c in keep}
+        self.actuals = {}
+        self._csv = None
+        self.full_bytes = int(forecast.memory_usage(deep=True).sum())
+
+        if actuals is not None:
+            self._align(actuals)
+
+    def _align(self, actuals):
+        # position of every actual date in the forecast timeline; dates the
+        # forecast doesn't cover are dropped, forecast dates without actuals stay NaN
+        pos = np.searchsorted(self.ds, actuals["ds"].values)
+        found = pos < len(self.ds)
+        found[found] = self.ds[pos[found]] == actuals["ds"].values[found]
+        pos = pos[found]
+
+        for col in actuals.select_dtypes(include=[np.number]).columns:
+            values = np.full(len(self.ds), np.nan, dtype=np.float32)
+            values[pos] = actuals[col].to_numpy(np.float32)[found]
+            self.actuals[col] = values
+
+    def __len__(self):
+        return len(self.ds)
+
+    @property
+    def nbytes(self):
+        arrays = [self.ds, *self.columns.values(), *self.actuals.values()]
+        return int(sum(a.nbytes for a in arrays))
+
+    def memory_report(self):
+        """Bytes of the full predict() frame vs this store (which also holds the actuals)."""
+        saved = self.full_bytes - self.nbytes
+        return {
+            "full_forecast_kb": round(self.full_bytes / 1024, 1),
+            "compact_kb": round(self.nbytes / 1024, 1),
+            "saved_kb": round(saved / 1024, 1),
+            "saved_pct": round(100 * saved / self.full_bytes, 1) if self.full_bytes else 0.0,
+        }
+
+    def index_of(self, date):
+        date = pd.Timestamp(date).to_datetime64()
+        i = int(np.searchsorted(self.ds, date))
+        if i < len(self.ds) and self.ds[i] == date:
+            return i
+        return None
+
+    def row(self, date):
+        """Forecast terms and actuals for one date as a dict, or None if the date isn't covered.
+
+        A regressor present in both (e.g. Promo) keeps its actual flag under its own
+        name and its forecast effect under "<name>_effect".
+        """
+        i = self.index_of(date)
+        if i is None:
+            return None
+        row = {"ds": pd.Timestamp(self.ds[i])}
+        for col, values in self.columns.items():
+            name = col + "_effect" if col in self.actuals else col
+            row[name] = float(values[i])
+        for col, values in self.actuals.items():
+            row[col] = float(values[i])
+        return row
+
+    def to_frame(self, columns=None, with_actuals=False):
+        """Materialise a DataFrame on demand, e.g. for plot_plotly or an export.
+
+        With actuals, colliding regressor columns follow row()'s "<name>_effect" naming.
+        """
+        columns = columns or list(self.columns)
+        frame = pd.DataFrame({"ds": self.ds})
+        for col in columns:
+            name = col + "_effect" if with_actuals and col in self.actuals else col
+            frame[name] = self.columns[col]
+        if with_actuals:
+            for col, values in self.actuals.items():
+                frame[col] = values
+        return frame
+
+    def to_csv(self):
+        """Full export with actuals, built on first use and then kept with the store."""
+        if self._csv is None:
+            self._csv = self.to_frame(with_actuals=True).to_csv(index=False)
+        return self._csv
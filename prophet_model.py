@@ -1,10 +1,10 @@
 import pandas as pd
 import numpy as np
-from prophet import Prophet
 import matplotlib.pyplot as plt
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import os
 import random
+from tuning import build_model, load_best_params, model_regressors, store_key
 
 # LOAD CLEANED DATA
 
@@ -23,14 +23,19 @@ print(f"Train size: {len(train)}")
 print(f"Test size: {len(test)}")
 
 # TRAINING PROPHET MODEL
-m = Prophet(
-    yearly_seasonality=True,
-    weekly_seasonality=True,
-    daily_seasonality=False
-)
+# Uses the per-store priors saved by tuning.py (Prophet defaults if not tuned yet),
+# with the same extra regressors they were tuned with
+params = load_best_params(store_key(df))
+regressors = list(model_regressors(df))
+print(f"Prophet params: {params} | regressors: {regressors}")
+
+m = build_model(params, regressors)
 m.fit(train)
 
 future = m.make_future_dataframe(periods=N, freq='D')
+if regressors:
+    # the test window's promo calendar is known in advance, so use the actual values
+    future = future.merge(df[["ds"] + regressors], on="ds", how="left")
 forecast = m.predict(future)
 
 
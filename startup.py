@@ -0,0 +1,112 @@
+import streamlit as st
+import base64
+import os
+import time
+from tuning import build_model
+from forecast_store import ForecastStore
+
+# ---------------------------
+# STARTUP + RERUN HELPERS
+# ---------------------------
+# Streamlit re-executes app.py / eda.py top to bottom on every widget change,
+# but imported modules (this one included) stay loaded for the whole process.
+# Anything cached here is therefore paid for once per process, not per rerun.
+
+_state = {"runs": 0, "cold_start": None, "forecasts": 0}
+
+
+def begin_run():
+    """Call once per script run. True on the process's first (cold) run."""
+    _state["runs"] += 1
+    return _state["runs"] == 1
+
+
+def mark_ready(t_run, cold):
+    """Seconds from `t_run` to now (the upload widget shown); remembered when `cold`.
+
+    `t_run` is taken by the script before its own imports, so on the cold run
+    their cost is included. The first run never has an upload yet, so the
+    value is kept here for the benchmark report of later runs.
+    """
+    elapsed = time.perf_counter() - t_run
+    if cold:
+        _state["cold_start"] = elapsed
+    return elapsed
+
+
+def cold_start_seconds():
+    """Time to first interaction of this process's first run, None before it finished."""
+    return _state["cold_start"]
+
+
+@st.cache_resource(show_spinner=False)
+def encode_image(image_path):
+    """Base64 of a local image, read and encoded once per process (None if missing)."""
+    if not os.path.exists(image_path):
+        return None
+    with open(image_path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+
+# Cached resources live for the whole process and are shared by all sessions;
+# bounded so old uploads / slider positions don't pile up in memory.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def fit_model(df, params=None, regressors=()):
+    """Fitted Prophet model, reused across reruns until the data or settings change.
+
+    Typing a chatbot question or moving the slider used to refit (and reload
+    the Stan model) on every rerun.
+    """
+    m = build_model(params, regressors)
+    m.fit(df)
+    return m
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def predict_store(_m, df, params=None, regressors=(), periods=90):
+    """Forecast for the fitted model `_m` as (future, ForecastStore, alignment seconds).
+
+    `_m` is skipped by Streamlit's hashing; `df` / `params` / `regressors`
+    identify it, exactly as in fit_model.
+    """
+    _state["forecasts"] += 1
+    future = _m.make_future_dataframe(periods=periods)
+    if regressors:
+        # unknown future promos are assumed off
+        future = future.merge(df[["ds"] + list(regressors)], on="ds", how="left").fillna(0)
+    forecast = _m.predict(future)
+
+    # keep only the terms the app reads, float32, actuals aligned by position
+    t0 = time.perf_counter()
+    store = ForecastStore(forecast, df, regressors)
+    return future, store, time.perf_counter() - t0
+
+
+def forecast(m, df, params=None, regressors=(), periods=90):
+    """predict_store plus whether this call computed it.
+
+    On a cache hit the alignment time is the one measured when the entry was
+    built, so callers should report it as cached rather than as a fresh timing.
+    """
+    before = _state["forecasts"]
+    future, store, align_seconds = predict_store(m, df, params, regressors, periods)
+    return future, store, align_seconds, _state["forecasts"] != before
+
+
+if __name__ == "__main__":
+    import subprocess
+    import sys
+
+    # Cold import cost of each stack, measured in a fresh interpreter each time
+    stacks = {
+        "streamlit": "import streamlit",
+        "pandas / numpy": "import pandas, numpy",
+        "plotly.express": "import plotly.express",
+        "prophet": "import prophet",
+        "prophet.plot": "import prophet.plot",
+    }
+    for name, stmt in stacks.items():
+        code = f"import time; t = time.perf_counter(); {stmt}; print(time.perf_counter() - t)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        took = f"{float(out.stdout.strip()):.2f}s" if out.returncode == 0 else "not installed"
+        print(f"{name:<16} {took}")
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast_store import ForecastStore
+
+
+@pytest.fixture
+def forecast():
+    ds = pd.date_range("2015-07-01", periods=6)
+    return pd.DataFrame({
+        "ds": ds,
+        "yhat": np.arange(6, dtype=float) * 10,
+        "yhat_lower": 0.0,
+        "yhat_upper": 100.0,
+        "trend": 1.0,
+        "Promo": 5.0,             # regressor effect, as Prophet names it
+        "Promo_lower": 4.0,       # dropped: not read by the app
+        "additive_terms": 2.0,    # dropped
+    })
+
+
+def test_aligns_unsorted_actuals_by_date(forecast):
+    actuals = pd.DataFrame({
+        "ds": pd.to_datetime(["2015-07-03", "2015-07-01", "2015-07-02"]),
+        "y": [3.0, 1.0, 2.0],
+    })
+
+    store = ForecastStore(forecast, actuals)
+
+    assert store.actuals["y"][:3].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_dates_outside_the_forecast_are_dropped_and_gaps_are_nan(forecast):
+    actuals = pd.DataFrame({
+        "ds": pd.to_datetime(["2015-06-30", "2015-07-02", "2015-07-10"]),
+        "y": [9.0, 2.0, 9.0],
+    })
+
+    store = ForecastStore(forecast, actuals)
+
+    y = store.actuals["y"]
+    assert len(y) == len(forecast)
+    assert y[1] == 2.0
+    assert np.isnan(np.delete(y, 1)).all()
+    assert store.row("2015-07-10") is None
+    assert np.isnan(store.row("2015-07-05")["y"])
+
+
+def test_columns_in_both_keep_actual_name_and_effect_suffix(forecast):
+    actuals = pd.DataFrame({"ds": forecast["ds"], "y": 1.0, "Promo": [0, 1, 0, 1, 0, 1]})
+
+    store = ForecastStore(forecast, actuals, regressors=["Promo"])
+    row = store.row("2015-07-02")
+
+    assert row["Promo"] == 1.0
+    assert row["Promo_effect"] == 5.0
+    assert row["yhat"] == 10.0
+
+    frame = store.to_frame(with_actuals=True)
+    assert frame["Promo"].tolist() == [0, 1, 0, 1, 0, 1]
+    assert (frame["Promo_effect"] == 5.0).all()
+    # without actuals the forecast keeps Prophet's own column names (for the plots)
+    assert "Promo" in store.to_frame().columns and "Promo_effect" not in store.to_frame().columns
+
+
+def test_keeps_only_needed_columns_as_float32(forecast):
+    store = ForecastStore(forecast)
+
+    assert set(store.columns) == {"yhat", "yhat_lower", "yhat_upper", "trend"}
+    assert all(v.dtype == np.float32 for v in store.columns.values())
+    assert store.memory_report()["saved_kb"] > 0
+
+
+def test_rejects_unsorted_forecast(forecast):
+    with pytest.raises(ValueError, match="sorted"):
+        ForecastStore(forecast.iloc[::-1])
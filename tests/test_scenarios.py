@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from scenarios import simulate, explain_scenario, promo_scenarios
+
+
+class StubModel:
+    """Stands in for a fitted Prophet model: yhat = 100 + 10 * day of month + 50 * Promo.
+
+    Like Prophet, predict() returns its rows sorted by ds (not stably), so any
+    positional mix-up in simulate() shows up as wrong deltas.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.extra_regressors = {"Promo": {}}
+        self.uncertainty_samples = 1000
+        self.predict_calls = []  # shared with shallow copies
+
+    def predict(self, df):
+        self.predict_calls.append(self.uncertainty_samples)
+        df = df.sort_values("ds").reset_index(drop=True)
+        yhat = 100 + 10 * df["ds"].dt.day + 50 * df["Promo"]
+        return pd.DataFrame({"ds": df["ds"], "yhat": yhat.astype(float)})
+
+
+@pytest.fixture
+def model():
+    ds = pd.date_range("2015-07-01", periods=10)
+    return StubModel(pd.DataFrame({"ds": ds, "y": 100.0, "Promo": [0, 1] * 5}))
+
+
+def test_simulate_batches_scenarios(model):
+    scenarios = promo_scenarios(model)
+    scenarios.append({"name": "Closed", "dates": ("2015-07-02", "2015-07-03"), "overrides": {"Open": 0}})
+
+    results, stats = simulate(model, scenarios)
+
+    # baseline + promo-on rows per date: two layers, however many scenarios
+    assert model.predict_calls == [0, 0]
+    assert stats["scenarios"] == 6
+    assert list(results["delta"][:5]) == [50.0] * 5
+    closed = results.iloc[-1]
+    assert closed["baseline"] == (100 + 20 + 50) + (100 + 30)
+    assert closed["delta"] == -closed["baseline"]
+    assert model.uncertainty_samples == 1000
+
+
+def test_simulate_matches_each_date_to_its_prediction(model):
+    # several dates, given out of order, with and without an override
+    scenarios = [
+        {"name": "late", "dates": ["2015-07-09"], "overrides": {"Promo": 1}},
+        {"name": "early", "dates": ["2015-07-01"], "overrides": {"Promo": 1}},
+        {"name": "drop", "dates": ["2015-07-06"], "overrides": {"Promo": 0}},
+        {"name": "range", "dates": ("2015-07-03", "2015-07-05"), "overrides": {"Promo": 1}},
+        {"name": "as is", "dates": ["2015-07-08", "2015-07-02"]},
+    ]
+
+    results = simulate(model, scenarios)[0].set_index("scenario")
+
+    assert results.loc["late", "baseline"] == 190.0
+    assert results.loc["late", "delta"] == 50.0
+    assert results.loc["early", "baseline"] == 110.0
+    assert results.loc["early", "delta"] == 50.0
+    assert results.loc["drop", "baseline"] == 210.0
+    assert results.loc["drop", "delta"] == -50.0
+    assert results.loc["range", "baseline"] == 130.0 + 190.0 + 150.0
+    assert results.loc["range", "delta"] == 100.0
+    assert results.loc["as is", "baseline"] == 230.0 + 170.0
+    assert results.loc["as is", "delta"] == 0.0
+
+
+def test_simulate_without_scenarios(model):
+    results, stats = simulate(model, [])
+
+    assert results.empty
+    assert stats["scenarios"] == 0
+    assert model.predict_calls == []
+
+
+def test_simulate_rejects_unknown_covariate(model):
+    with pytest.raises(ValueError, match="not model regressors"):
+        simulate(model, [{"dates": ["2015-07-01"], "overrides": {"Customers": 10}}])
+
+
+def test_explain_scenario():
+    row = {"delta": 1234.4, "end": pd.Timestamp("2015-07-10")}
+    assert explain_scenario(row, {"Promo": 1}) == "Promo would have added 1,234 in sales"
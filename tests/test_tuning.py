@@ -0,0 +1,93 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tuning
+
+
+def make_series(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "ds": pd.date_range("2014-01-01", periods=n),
+        "y": rng.random(n),
+        "Promo": np.arange(n) % 2,
+    })
+
+
+@pytest.fixture
+def fits(monkeypatch):
+    """Replace the Prophet fit with a cheap deterministic score; records every call."""
+    calls = []
+
+    def fake_score_fold(df, params, fold, regressors=()):
+        calls.append((params["changepoint_prior_scale"], params["seasonality_prior_scale"],
+                      params["seasonality_mode"], fold))
+        mode = 0.5 if params["seasonality_mode"] == "multiplicative" else 0.0
+        return params["changepoint_prior_scale"] * 100 + params["seasonality_prior_scale"] + mode + fold
+
+    monkeypatch.setattr(tuning, "score_fold", fake_score_fold)
+    return calls
+
+
+def test_fold_split_boundaries():
+    df = make_series(200)
+
+    train, test = tuning.fold_split(df, 2)
+    assert len(train) == 170 and list(test.index) == list(range(170, 200))
+
+    train, test = tuning.fold_split(df, 0)
+    assert len(train) == 110 and list(test.index) == list(range(110, 140))
+
+
+def test_cache_key_covers_fold_definition_and_model_spec(monkeypatch):
+    params = tuning.DEFAULT_PARAMS
+    key = tuning.cache_key("abc", params, 0)
+
+    assert tuning.cache_key("abc", params, 0, ("Promo",)) != key
+    assert tuning.cache_key("abc", params, 1) != key
+
+    monkeypatch.setattr(tuning, "HORIZON", 14)
+    assert tuning.cache_key("abc", params, 0) != key
+    monkeypatch.undo()
+
+    monkeypatch.setattr(tuning, "SEASONALITY", {**tuning.SEASONALITY, "daily_seasonality": True})
+    assert tuning.cache_key("abc", params, 0) != key
+
+
+def test_halving_schedule_and_resume_from_cache(fits, tmp_path):
+    series = {"1": make_series()}
+
+    with ThreadPoolExecutor(4) as pool:
+        best = tuning.search(series, pool, "halving", cache_dir=tmp_path)
+
+    # 40 candidates on the latest fold, 20 survivors add fold 1, 10 add fold 0
+    folds = [call[-1] for call in fits]
+    assert (folds.count(2), folds.count(1), folds.count(0)) == (40, 20, 10)
+    assert best["1"][0] == {"changepoint_prior_scale": 0.001, "seasonality_prior_scale": 0.01,
+                            "seasonality_mode": "additive"}
+
+    fits.clear()
+    with ThreadPoolExecutor(4) as pool:
+        again = tuning.search(series, pool, "halving", cache_dir=tmp_path)
+
+    assert fits == []
+    assert again == best
+
+
+def test_failed_store_does_not_stop_the_others(monkeypatch, tmp_path):
+    def flaky_score_fold(df, params, fold, regressors=()):
+        if len(df) == 150:
+            raise RuntimeError("bad series")
+        return params["changepoint_prior_scale"]
+
+    monkeypatch.setattr(tuning, "score_fold", flaky_score_fold)
+    series = {"good": make_series(200), "bad": make_series(150)}
+
+    with ThreadPoolExecutor(4) as pool:
+        best = tuning.search(series, pool, "grid", cache_dir=tmp_path)
+
+    assert list(best) == ["good"]
+    assert len(os.listdir(tmp_path)) == 40 * tuning.N_FOLDS
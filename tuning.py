@@ -0,0 +1,308 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import itertools
+import hashlib
+import json
+import logging
+import os
+import time
+
+# Prophet / cmdstanpy print a line per fit, which floods the console in a search
+logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+logging.getLogger("prophet").setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# SEARCH CONFIG
+# ---------------------------
+CACHE_DIR = "data/tuning_cache"
+BEST_PARAMS_PATH = "data/best_params.json"
+
+# Prophet defaults, used whenever no tuned configuration exists for a store
+DEFAULT_PARAMS = {
+    "changepoint_prior_scale": 0.05,
+    "seasonality_prior_scale": 10.0,
+    "seasonality_mode": "additive",
+}
+
+PARAM_GRID = {
+    "changepoint_prior_scale": [0.001, 0.01, 0.05, 0.1, 0.5],
+    "seasonality_prior_scale": [0.01, 0.1, 1.0, 10.0],
+    "seasonality_mode": ["additive", "multiplicative"],
+}
+
+HORIZON = 30    # days per backtest fold, same window as prophet_model.py
+N_FOLDS = 3     # expanding-window folds, last one ends at the final date
+
+# Fixed (untuned) part of the model; part of every cache key
+SEASONALITY = {
+    "yearly_seasonality": True,
+    "weekly_seasonality": True,
+    "daily_seasonality": False,
+}
+
+# Covariates fitted as extra regressors whenever the data has them
+REGRESSORS = ["Promo"]
+
+
+def model_regressors(df):
+    """Extra regressors the forecasting paths (and the tuner) fit for this data."""
+    return tuple(c for c in REGRESSORS if c in df.columns)
+
+
+def build_model(params=None, regressors=()):
+    """Prophet with the app's fixed seasonality settings plus tunable priors.
+
+    `regressors` are covariate columns (e.g. Promo) added as extra regressors,
+    which lets scenarios.py override them on a fitted model.
+    """
+    # imported here so app.py can read the tuned params without paying for the
+    # prophet import before its upload widget is shown
+    from prophet import Prophet
+
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    m = Prophet(**SEASONALITY, **params)
+    for name in regressors:
+        m.add_regressor(name)
+    return m
+
+
+def param_grid(grid=None):
+    grid = grid or PARAM_GRID
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+# ---------------------------
+# DISK CACHE
+# ---------------------------
+def data_hash(df, regressors=()):
+    """Stable fingerprint of the series (and covariates) a candidate is scored on."""
+    hashed = pd.util.hash_pandas_object(df[["ds", "y"] + list(regressors)], index=False).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+
+def cache_key(dhash, params, fold, regressors=()):
+    # a fold's meaning depends on HORIZON / N_FOLDS, and its score on the fixed
+    # model spec, so all of them are part of the key
+    raw = json.dumps({
+        "data": dhash,
+        "params": params,
+        "fold": fold,
+        "n_folds": N_FOLDS,
+        "horizon": HORIZON,
+        "seasonality": SEASONALITY,
+        "regressors": list(regressors),
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def cache_get(key, cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, key + ".json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)["mae"]
+    except (ValueError, KeyError):
+        # half-written file from an interrupted run; just recompute it
+        return None
+
+
+def cache_put(key, mae, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + ".json")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"mae": mae}, f)
+    os.replace(tmp, path)
+
+
+# ---------------------------
+# BACKTEST SCORING
+# ---------------------------
+def fold_split(df, fold, n_folds=N_FOLDS, horizon=HORIZON):
+    """Fold 0 is the earliest cutoff; fold n_folds-1 tests on the last `horizon` rows."""
+    end = len(df) - (n_folds - 1 - fold) * horizon
+    return df[:end - horizon], df[end - horizon:end]
+
+
+def score_fold(df, params, fold, regressors=(), n_folds=N_FOLDS, horizon=HORIZON):
+    """Fit on the fold's training window and return MAE on its test window.
+
+    Top-level so it can be pickled into worker processes.
+    """
+    from sklearn.metrics import mean_absolute_error
+
+    train, test = fold_split(df, fold, n_folds, horizon)
+    m = build_model(params, regressors)
+    m.fit(train)
+    forecast = m.predict(test[["ds"] + list(regressors)])
+    return float(mean_absolute_error(test["y"].values, forecast["yhat"].values))
+
+
+def evaluate(tasks, pool, regressors=(), cache_dir=CACHE_DIR):
+    """Mean MAE per candidate for several stores at once, reusing cached fold scores.
+
+    `tasks` maps store -> (df, candidates, folds). Every uncached fold of every
+    store goes into the shared `pool` together, so the workers stay busy even
+    when one store is down to a handful of candidates.
+    Returns store -> list of scores aligned with that store's candidates.
+    """
+    scores = {}
+    jobs = {}
+
+    for store, (df, candidates, folds) in tasks.items():
+        dhash = data_hash(df, regressors)
+        for i, params in enumerate(candidates):
+            for fold in folds:
+                key = cache_key(dhash, params, fold, regressors)
+                mae = cache_get(key, cache_dir)
+                if mae is None:
+                    job = pool.submit(score_fold, df, params, fold, regressors)
+                    jobs[job] = (store, i, fold, key)
+                else:
+                    scores[(store, i, fold)] = mae
+
+    # written as each finishes, so an interrupted search keeps its progress.
+    # A failing fit scores inf (and isn't cached) instead of aborting every store.
+    for job in as_completed(jobs):
+        store, i, fold, key = jobs[job]
+        try:
+            mae = job.result()
+        except Exception as e:
+            logger.warning("Store %s, candidate %s, fold %s failed: %s", store, tasks[store][1][i], fold, e)
+            scores[(store, i, fold)] = float("inf")
+            continue
+        cache_put(key, mae, cache_dir)
+        scores[(store, i, fold)] = mae
+
+    return {
+        store: [float(np.mean([scores[(store, i, f)] for f in folds])) for i in range(len(candidates))]
+        for store, (df, candidates, folds) in tasks.items()
+    }
+
+
+# ---------------------------
+# SEARCH STRATEGIES
+# ---------------------------
+def search(series, pool, method="halving", eta=2, regressors=(), cache_dir=CACHE_DIR):
+    """Best (params, MAE) per store, for all stores in `series` (store -> df) together.
+
+    Stores whose candidates all fail to fit are left out of the result.
+
+    "grid" scores every candidate on all folds in one round. "halving" scores
+    everyone on the latest fold, keeps the best 1/eta, adds an earlier fold and
+    repeats; folds are added newest first, so the survivors are always judged on
+    the most recent behaviour of the series.
+    """
+    n_start = N_FOLDS if method == "grid" else 1
+    state = {store: (param_grid(), n_start) for store in series}
+    best = {}
+
+    while state:
+        tasks = {
+            store: (series[store], candidates, list(range(N_FOLDS - n_used, N_FOLDS)))
+            for store, (candidates, n_used) in state.items()
+        }
+        scores = evaluate(tasks, pool, regressors, cache_dir)
+
+        for store, (candidates, n_used) in list(state.items()):
+            ranked = np.argsort(scores[store])
+            if not np.isfinite(scores[store][ranked[0]]):
+                # every remaining candidate failed; nothing worth saving for this store
+                logger.warning("Store %s: all candidates failed, dropped", store)
+                del state[store]
+                continue
+            if len(candidates) == 1 or n_used == N_FOLDS:
+                top = int(ranked[0])
+                best[store] = (candidates[top], scores[store][top])
+                del state[store]
+            else:
+                keep = max(1, len(candidates) // eta)
+                state[store] = ([candidates[i] for i in ranked[:keep]], n_used + 1)
+
+    return best
+
+
+# ---------------------------
+# BEST CONFIG PER STORE
+# ---------------------------
+def store_key(df):
+    """'Store' id when the frame holds one store, 'all' for the aggregated series."""
+    if "Store" in df.columns and df["Store"].nunique() == 1:
+        return str(df["Store"].iloc[0])
+    return "all"
+
+
+def load_best_params(store="all", path=BEST_PARAMS_PATH):
+    """Tuned Prophet params for `store`, or the defaults if it was never tuned."""
+    if os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+        if store in saved:
+            return {k: saved[store][k] for k in DEFAULT_PARAMS}
+    return dict(DEFAULT_PARAMS)
+
+
+def save_best_params(best, path=BEST_PARAMS_PATH):
+    """Merge store -> (params, MAE) into the saved configurations, in one write."""
+    saved = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+    for store, (params, score) in best.items():
+        saved[store] = {**params, "mae": score}
+    with open(path, "w") as f:
+        json.dump(saved, f, indent=2)
+
+
+def tune_stores(df, method="halving", n_jobs=None, cache_dir=CACHE_DIR, path=BEST_PARAMS_PATH):
+    """Tune every store in `df` (one series if there is no 'Store' column).
+
+    Candidates are fitted with the same extra regressors the app uses
+    (see model_regressors), so the saved priors match the model it fits.
+    """
+    regressors = model_regressors(df)
+    groups = df.groupby("Store") if "Store" in df.columns else [("all", df)]
+    series = {}
+
+    for store, sdf in groups:
+        sdf = sdf.sort_values("ds").reset_index(drop=True)
+        if len(sdf) <= (N_FOLDS + 1) * HORIZON:
+            print(f"Store {store}: only {len(sdf)} rows, skipped")
+            continue
+        series[str(store)] = sdf
+
+    # one pool for the whole run: workers import prophet once, not once per round per store
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        best = search(series, pool, method, regressors=regressors, cache_dir=cache_dir)
+
+    save_best_params(best, path)
+    results = {}
+    for store, (params, score) in best.items():
+        results[store] = params
+        print(f"Store {store}: MAE {score:.2f} -> {params}")
+
+    print(f"Tuned {len(results)} store(s) in {time.time() - t0:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tune Prophet priors per store.")
+    parser.add_argument("--data", default="data/prophet_ready.csv")
+    parser.add_argument("--method", choices=["halving", "grid"], default="halving")
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        raise FileNotFoundError(f"{args.data} not found. Please run eda.py first.")
+
+    df = pd.read_csv(args.data, parse_dates=["ds"])
+    tune_stores(df, method=args.method, n_jobs=args.jobs)
+    print(f"\n Best parameters saved to: {BEST_PARAMS_PATH}")